@@ -26,6 +26,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Shared by every request so the adapter's log files are opened once, not per request
+adapter = SimpleLocalAdapter(data_dir='../storage/data')
+
+@app.on_event("shutdown")
+def close_adapter():
+    adapter.close()
+
 class QueryRequest(BaseModel):
     query: str
     max_depth: Optional[int] = 2
@@ -78,9 +85,6 @@ async def scrape_contact_details(request: QueryRequest):
     Scrape contact details from a URL without external dependencies.
     """
     try:
-        # Initialize adapter with relative path
-        adapter = SimpleLocalAdapter(data_dir='../storage/data')
-        
         # Log the request
         adapter.log_info(f"Processing scrape request for: {request.query}")
         
@@ -132,9 +136,6 @@ async def process_query(request: QueryRequest):
     Process a query using the simplified main function.
     """
     try:
-        # Initialize adapter
-        adapter = SimpleLocalAdapter(data_dir='../storage/data')
-        
         adapter.log_info(f"Processing query: {request.query}")
         
         # Use simple web scraping
@@ -187,7 +188,6 @@ async def process_query(request: QueryRequest):
 async def list_jobs():
     """List all jobs with their status"""
     try:
-        adapter = SimpleLocalAdapter(data_dir='../storage/data')
         jobs = adapter.storage_manager.list_jobs(limit=50)
         
         return {
@@ -201,7 +201,6 @@ async def list_jobs():
 async def get_job_result(job_id: str):
     """Get detailed job result by ID"""
     try:
-        adapter = SimpleLocalAdapter(data_dir='../storage/data')
         job_result = adapter.storage_manager.load_job_result(job_id)
         
         if not job_result:
@@ -217,7 +216,6 @@ async def get_job_result(job_id: str):
 async def get_job_summary(job_id: str):
     """Get text summary of job result"""
     try:
-        adapter = SimpleLocalAdapter(data_dir='../storage/data')
         job_result = adapter.storage_manager.load_job_result(job_id)
         
         if not job_result:
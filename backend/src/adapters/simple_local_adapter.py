@@ -16,6 +16,7 @@ class SimpleLocalAdapter(PlatformAdapter):
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.users_file = self.data_dir / "users.json"
         self.storage_manager = JobStorageManager(str(self.data_dir))
+        self._log_handle = None
         
     async def get_input(self):
         """Get input from file or stdin - no external API needed"""
@@ -107,7 +108,7 @@ class SimpleLocalAdapter(PlatformAdapter):
     async def _simple_push_data(self, data):
         """Fallback simple data save method"""
         timestamp = datetime.now().isoformat()
-        job_id = hashlib.md5(str(data).encode()).hexdigest()[:8]
+        job_id = hashlib.blake2b(str(data).encode(), digest_size=4).hexdigest()
         
         jobs_dir = self.data_dir / "jobs"
         jobs_dir.mkdir(exist_ok=True)
@@ -129,10 +130,17 @@ class SimpleLocalAdapter(PlatformAdapter):
         log_msg = f"[{timestamp}] {msg}"
         print(log_msg)
         
-        # Also log to file
-        log_file = self.data_dir / "app.log"
-        with open(log_file, 'a') as f:
-            f.write(log_msg + "\n")
+        # Also log to file, kept open line-buffered rather than reopened per message
+        if self._log_handle is None:
+            self._log_handle = open(self.data_dir / "app.log", 'a', buffering=1)
+        self._log_handle.write(log_msg + "\n")
+    
+    def close(self):
+        """Close the log files held by this adapter and its storage manager"""
+        if self._log_handle is not None:
+            self._log_handle.close()
+            self._log_handle = None
+        self.storage_manager.close()
     
     async def fail(self, status_message, exception=None):
         """Handle failures locally"""
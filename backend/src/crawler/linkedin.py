@@ -6,14 +6,72 @@ import random
 import re
 import time
 from typing import Dict, List, Optional, Any
-from urllib.parse import urljoin, urlparse
+from urllib.parse import parse_qsl, urljoin, urlparse, urlsplit, urlunsplit
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 
+import httpx
 from playwright.async_api import async_playwright, Browser, Page, TimeoutError as PlaywrightTimeoutError
 
 logger = logging.getLogger('linkedin_crawler')
 
+_URL_RE = re.compile(r'https?://[^\s]+')
+# LinkedIn tracking parameters that do not change which page is served
+_TRACKING_PARAMS = frozenset({'trk', 'originalSubdomain'})
+
+# First LinkedIn path segment that identifies a profile or company page
+_PAGE_TYPE_RE = re.compile(r'/(in|profile|company)/')
+
+# Retry policy for the Contact Details Scraper call in the legacy crawler
+SCRAPER_MAX_RETRIES = 3
+SCRAPER_BASE_DELAY = 1.0
+SCRAPER_MAX_DELAY = 30.0
+SCRAPER_JITTER = 0.5
+# Start URLs per scraper run, and how many runs may be in flight at once
+SCRAPER_CHUNK_SIZE = 8
+SCRAPER_CONCURRENCY = 4
+
+# Record fields dropped from scraper results when include_socials is False
+_SOCIAL_FIELDS = ("linkedIns", "twitters", "facebooks", "instagrams", "youtubes")
+# Company "About" labels (lowercased) mapped to the field they populate, in match order
+_COMPANY_DETAIL_FIELDS = (
+    ('industry', 'industry'),
+    ('company size', 'company_size'),
+    ('headquarters', 'headquarters'),
+    ('founded', 'founded'),
+    ('specialties', 'specialties'),
+)
+
+def _canonical_url(url: str) -> str:
+    """Strip tracking parameters and the path's trailing slash from a LinkedIn URL."""
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        # Free-text matches such as markdown links can carry stray brackets; leave them as-is
+        return url
+    host = parts.hostname or ''
+    if host != 'linkedin.com' and not host.endswith('.linkedin.com'):
+        return url
+    query = parts.query
+    if query:
+        # Filter the raw key=value pairs so the kept ones stay encoded exactly as given
+        query = '&'.join(
+            pair for pair in query.split('&')
+            if pair and parse_qsl(pair, keep_blank_values=True)[0][0] not in _TRACKING_PARAMS
+        )
+    return urlunsplit((parts.scheme, parts.netloc, parts.path.rstrip('/'), query, parts.fragment))
+
+def _page_type(url: str) -> Optional[str]:
+    """Classify a LinkedIn URL as 'profile' or 'company' from its path, or None for other pages."""
+    match = _PAGE_TYPE_RE.search(url)
+    if not match:
+        return None
+    return 'company' if match.group(1) == 'company' else 'profile'
+
+def _unique_urls(urls: List[str]) -> List[str]:
+    """Canonicalize URLs and drop repeats, keeping the order they were first seen in."""
+    return list(dict.fromkeys(_canonical_url(url) for url in urls))
+
 @dataclass
 class ProxyConfig:
     """Configuration for proxy settings."""
@@ -61,7 +119,7 @@ class RateLimiter:
             oldest_request = min(self.request_times)
             wait_time = 60 - (now - oldest_request)
             if wait_time > 0:
-                logger.info(f"Rate limiting: waiting {wait_time:.2f} seconds")
+                logger.info("Rate limiting: waiting %.2f seconds", wait_time)
                 await asyncio.sleep(wait_time)
         
         # Record this request
@@ -374,21 +432,17 @@ class LinkedInCrawler:
                 info_elements = await page.query_selector_all('.org-page-details__definition-text')
                 labels = await page.query_selector_all('.org-page-details__definition-term')
                 
-                for i, label_element in enumerate(labels):
-                    if i < len(info_elements):
-                        label = await label_element.inner_text()
-                        value = await info_elements[i].inner_text()
-                        
-                        if 'industry' in label.lower():
-                            company_data['industry'] = value
-                        elif 'company size' in label.lower():
-                            company_data['company_size'] = value
-                        elif 'headquarters' in label.lower():
-                            company_data['headquarters'] = value
-                        elif 'founded' in label.lower():
-                            company_data['founded'] = value
-                        elif 'specialties' in label.lower():
-                            company_data['specialties'] = [s.strip() for s in value.split(',')]
+                for label_element, info_element in zip(labels, info_elements):
+                    label = (await label_element.inner_text()).lower()
+                    field = next((f for keyword, f in _COMPANY_DETAIL_FIELDS if keyword in label), None)
+                    if field is None:
+                        continue
+
+                    value = await info_element.inner_text()
+                    if field == 'specialties':
+                        company_data['specialties'] = [s.strip() for s in value.split(',')]
+                    else:
+                        company_data[field] = value
             except Exception as e:
                 logger.warning(f"Could not extract company details: {e}")
             
@@ -403,7 +457,7 @@ class LinkedInCrawler:
         if not self.browser:
             raise RuntimeError("Browser not initialized. Use async context manager.")
         
-        logger.info(f"Scraping LinkedIn URL: {url}")
+        logger.info("Scraping LinkedIn URL: %s", url)
         
         # Apply rate limiting
         await self.rate_limiter.wait_if_needed()
@@ -418,9 +472,10 @@ class LinkedInCrawler:
             await self._simulate_human_behavior(page)
             
             # Determine if this is a profile or company page
-            if '/in/' in url or '/profile/' in url:
+            page_type = _page_type(url)
+            if page_type == 'profile':
                 result = await self._extract_profile_data(page, url)
-            elif '/company/' in url:
+            elif page_type == 'company':
                 result = await self._extract_company_data(page, url)
             else:
                 # Generic extraction for other LinkedIn pages
@@ -443,10 +498,10 @@ class LinkedInCrawler:
                 try:
                     if result.get('type') == 'profile':
                         success = db_manager.save_profile(result)
-                        logger.info(f"Profile saved to database: {success}")
+                        logger.info("Profile saved to database: %s", success)
                     elif result.get('type') == 'company':
                         success = db_manager.save_company(result)
-                        logger.info(f"Company saved to database: {success}")
+                        logger.info("Company saved to database: %s", success)
                 except Exception as e:
                     logger.warning(f"Failed to save to database: {e}")
             
@@ -487,7 +542,8 @@ async def run_linkedin_crawler(
     Returns:
         Dictionary containing scraped data and job information
     """
-    logger.info(f"Starting LinkedIn crawler with query: {query}")
+    logger.info("Starting LinkedIn crawler with a %d character query", len(query))
+    logger.debug("Crawler query: %s", query)
     
     # Initialize database if needed
     db_manager = None
@@ -496,20 +552,19 @@ async def run_linkedin_crawler(
         try:
             from ..database.models import DatabaseManager
             db_manager = DatabaseManager(db_path)
-            logger.info(f"Database initialized at {db_path}")
+            logger.info("Database initialized at %s", db_path)
         except Exception as e:
             logger.error(f"Failed to initialize database: {e}")
             save_to_db = False
     
     # Extract URLs from query
-    url_pattern = r'https?://[^\s]+'
-    urls = re.findall(url_pattern, query)
+    urls = _unique_urls(_URL_RE.findall(query))
     
     if not urls:
         # If no URL found, assume the query is a LinkedIn URL or construct one
         parsed_url = urlparse(query.strip())
         if parsed_url.hostname and parsed_url.hostname.endswith(".linkedin.com"):
-            urls = [query.strip()]
+            urls = [_canonical_url(query.strip())]
         else:
             # This is a fallback - in a real implementation, you might want to
             # search LinkedIn for the query terms
@@ -549,20 +604,22 @@ async def run_linkedin_crawler(
             crawler_config['anti_detection_config'] = anti_detection_config
         
         async with LinkedInCrawler(**crawler_config) as crawler:
-            for i, url in enumerate(urls[:max_depth]):
+            crawl_urls = urls[:max_depth]
+            for i, url in enumerate(crawl_urls, 1):
                 try:
-                    logger.info(f"Scraping URL {i+1}/{len(urls[:max_depth])}: {url}")
+                    logger.info("Scraping URL %d/%d: %s", i, len(crawl_urls), url)
                     
                     # Check if we already have this data in the database
                     existing_data = None
                     if db_manager:
-                        if '/in/' in url or '/profile/' in url:
+                        page_type = _page_type(url)
+                        if page_type == 'profile':
                             existing_data = db_manager.get_profile(url)
-                        elif '/company/' in url:
+                        elif page_type == 'company':
                             existing_data = db_manager.get_company(url)
                     
                     if existing_data:
-                        logger.info(f"Using cached data for {url}")
+                        logger.info("Using cached data for %s", url)
                         result = existing_data
                         result['cached'] = True
                     else:
@@ -586,9 +643,9 @@ async def run_linkedin_crawler(
                         )
                     
                     # Add delay between requests (unless it's the last URL)
-                    if i < len(urls[:max_depth]) - 1:
+                    if i < len(crawl_urls):
                         delay = random.uniform(2, 5)  # Random delay between 2-5 seconds
-                        logger.info(f"Waiting {delay:.1f} seconds before next request...")
+                        logger.info("Waiting %.1f seconds before next request...", delay)
                         await asyncio.sleep(delay)
                         
                 except Exception as e:
@@ -638,10 +695,59 @@ async def run_linkedin_crawler(
         'database_enabled': save_to_db
     }
     
-    logger.info(f"Crawler completed. Scraped: {scraped_count}, Failed: {failed_count}, Job ID: {job_id}")
+    logger.info("Crawler completed. Scraped: %s, Failed: %s, Job ID: %s", scraped_count, failed_count, job_id)
     return result
 
 
+def _is_transient_scraper_error(error: BaseException) -> bool:
+    """Whether a Contact Details Scraper failure is worth retrying.
+
+    Network failures surface as raw httpx errors once apify_client's own retries
+    are spent. API errors are retried only for 5xx and 429; other 4xx responses
+    (bad token, invalid input) are permanent.
+    """
+    if isinstance(error, (httpx.TransportError, asyncio.TimeoutError)):
+        return True
+    # ApifyApiError carries the HTTP status; it is only importable from a private module
+    status_code = getattr(error, "status_code", None)
+    return isinstance(status_code, int) and (status_code >= 500 or status_code == 429)
+
+
+async def _scrape_chunk(
+    start_urls: List[Dict[str, str]],
+    max_depth: int,
+    include_socials: bool,
+) -> List[Dict[str, Any]]:
+    """Scrape one chunk of start URLs, retrying transient failures with jittered backoff."""
+    from ..tools import stream_contact_details
+
+    results: List[Dict[str, Any]] = []
+    for attempt in range(SCRAPER_MAX_RETRIES):
+        results.clear()
+        try:
+            async for record in stream_contact_details(
+                start_urls,
+                max_depth=max_depth,
+                omit_fields=() if include_socials else _SOCIAL_FIELDS,
+            ):
+                results.append(record)
+            break
+        except Exception as e:
+            if not _is_transient_scraper_error(e):
+                raise
+            logger.warning(
+                "Contact Details Scraper failed on attempt %d: %s",
+                attempt + 1,
+                e,
+            )
+            if attempt == SCRAPER_MAX_RETRIES - 1:
+                raise
+            # Jitter keeps concurrent callers from retrying in lockstep
+            delay = min(SCRAPER_MAX_DELAY, SCRAPER_BASE_DELAY * 2 ** attempt)
+            await asyncio.sleep(delay * (1 + random.uniform(0, SCRAPER_JITTER)))
+    return results
+
+
 # Legacy compatibility for the original function
 async def run_linkedin_crawler_legacy(
     query: str,
@@ -652,38 +758,40 @@ async def run_linkedin_crawler_legacy(
     Legacy LinkedIn crawler for backward compatibility.
     
     This maintains the original behavior while using the new enhanced crawler.
+    Start URLs are split into chunks of ``SCRAPER_CHUNK_SIZE`` that are scraped
+    concurrently, at most ``SCRAPER_CONCURRENCY`` at a time; if one chunk fails
+    the others are cancelled. Contact details are deduplicated across chunks.
     """
-    from ..tools import call_contact_details_scraper
-    
-    urls = [part.strip() for part in query.split() if part.strip()]
-    start_urls = [{"url": url} for url in urls if url.startswith("http")]
+    from ..tools import _dedup_key
+
+    urls = _unique_urls(_URL_RE.findall(query))
+    start_urls = [{"url": url} for url in urls]
     if not start_urls:
         raise ValueError("No LinkedIn URLs provided")
 
-    for attempt in range(3):
-        try:
-            data = await call_contact_details_scraper(start_urls, max_depth=max_depth)
-            break
-        except Exception as e:
-            logger.warning(
-                "Contact Details Scraper failed on attempt %d: %s",
-                attempt + 1,
-                e,
-            )
-            if attempt == 2:
-                raise
-            await asyncio.sleep(2 ** attempt)
+    # Fan the URLs out over several scraper runs so their network waits overlap
+    chunks = [
+        start_urls[i:i + SCRAPER_CHUNK_SIZE]
+        for i in range(0, len(start_urls), SCRAPER_CHUNK_SIZE)
+    ]
+    semaphore = asyncio.Semaphore(SCRAPER_CONCURRENCY)
 
-    if not include_socials:
-        for record in data:
-            for field in (
-                "linkedIns",
-                "twitters",
-                "facebooks",
-                "instagrams",
-                "youtubes",
-            ):
-                record.pop(field, None)
-
-    return {"query": query, "results": data}
+    async def _run(chunk: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        async with semaphore:
+            return await _scrape_chunk(chunk, max_depth, include_socials)
 
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(_run(chunk)) for chunk in chunks]
+    except ExceptionGroup as group:
+        # Surface the first failure itself so callers see the same exception types as before
+        raise group.exceptions[0] from None
+    seen: set = set()
+    results = []
+    for task in tasks:
+        for record in task.result():
+            key = _dedup_key(record)
+            if key not in seen:
+                seen.add(key)
+                results.append(record)
+    return {"query": query, "results": results}
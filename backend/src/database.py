@@ -4,10 +4,10 @@ import sqlite3
 import json
 import threading
 import logging
-from datetime import datetime
-from typing import Optional, Any, Dict, List
+import time
+from typing import Optional, Any, Dict, List, Tuple
 from contextlib import contextmanager
-from queue import Queue, Empty
+from queue import Queue, Empty, Full
 
 # Configure structured logging
 logging.basicConfig(
@@ -51,6 +51,58 @@ CREATE INDEX IF NOT EXISTS idx_batches_job_id ON batches(job_id);
 CREATE INDEX IF NOT EXISTS idx_batches_status ON batches(status);
 """
 
+# (second, formatted prefix) of the last timestamp; swapped as one tuple so threads never see a torn pair
+_now_cache = (0, "")
+
+# Applied only while the database file is still empty; these settings are fixed
+# once the first page is written, which enabling WAL already does
+NEW_DATABASE_PRAGMAS = (
+    "PRAGMA page_size=8192",
+    "PRAGMA auto_vacuum=INCREMENTAL",
+)
+
+# Applied to every connection; WAL mode lets readers proceed alongside the writer,
+# and mmap turns page reads into memory loads instead of read() syscalls
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=10000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA wal_autocheckpoint=1000",
+)
+
+# Reader connections kept open per JobDB (covers the worker's max batch concurrency);
+# readers beyond that wait briefly, then get a temporary connection
+READER_POOL_SIZE = 10
+
+# Committed write transactions between explicit WAL truncations
+WAL_CHECKPOINT_INTERVAL = 500
+
+JOB_STATUSES = ("queued", "running", "finished", "failed")
+BATCH_STATUSES = ("pending", "running", "finished", "failed")
+
+def _status_update(table: str, row_id: int, status: str, error_msg: Optional[str], now: str) -> Tuple[str, tuple]:
+    """Build the UPDATE statement for a job or batch status change"""
+    if status == "running":
+        return f"UPDATE {table} SET status=?, started_at=? WHERE id=?", (status, now, row_id)
+    if status in ("finished", "failed"):
+        return f"UPDATE {table} SET status=?, finished_at=?, error_msg=? WHERE id=?", (status, now, error_msg, row_id)
+    return f"UPDATE {table} SET status=? WHERE id=?", (status, row_id)
+
+def _fast_now_iso() -> str:
+    """Current UTC time in datetime.isoformat() layout, without allocating a datetime.
+
+    The date/time prefix is only re-formatted when the second changes.
+    """
+    global _now_cache
+    sec, ns = divmod(time.time_ns(), 1_000_000_000)
+    cached_sec, prefix = _now_cache
+    if sec != cached_sec:
+        prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(sec))
+        _now_cache = (sec, prefix)
+    return f"{prefix}.{ns // 1000:06d}"
+
 class ConnectionPool:
     """Simple connection pool for SQLite"""
     def __init__(self, sqlite_path: str, max_connections: int = 10):
@@ -68,19 +120,7 @@ class ConnectionPool:
     
     def _create_connection(self):
         """Create a new database connection"""
-        conn = sqlite3.connect(
-            self.sqlite_path, 
-            check_same_thread=False, 
-            isolation_level=None,
-            timeout=30.0
-        )
-        conn.row_factory = sqlite3.Row
-        # Enable WAL mode for better concurrency
-        conn.execute("PRAGMA journal_mode=WAL")
-        conn.execute("PRAGMA synchronous=NORMAL")
-        conn.execute("PRAGMA cache_size=10000")
-        conn.execute("PRAGMA temp_store=MEMORY")
-        return conn
+        return get_conn(self.sqlite_path)
     
     @contextmanager
     def get_connection(self):
@@ -102,11 +142,9 @@ class ConnectionPool:
                 try:
                     # Return connection to pool if it's healthy
                     conn.execute("SELECT 1")  # Test connection
-                    if self.pool.qsize() < self.max_connections:
-                        self.pool.put(conn)
-                    else:
-                        conn.close()
-                except:
+                    # put_nowait rather than a qsize() check, which another thread can race past
+                    self.pool.put_nowait(conn)
+                except (sqlite3.Error, Full):
                     conn.close()
     
     def close_all(self):
@@ -119,25 +157,60 @@ class ConnectionPool:
                 break
 
 def get_conn(sqlite_path: str):
-    conn = sqlite3.connect(sqlite_path, check_same_thread=False, isolation_level=None)
+    """Open a connection configured with the shared PRAGMAs"""
+    conn = sqlite3.connect(
+        sqlite_path,
+        check_same_thread=False,
+        isolation_level=None,
+        timeout=30.0
+    )
     conn.row_factory = sqlite3.Row
+    if sqlite_path == ":memory:":
+        # No file to journal, map or vacuum
+        return conn
+    if conn.execute("PRAGMA page_count").fetchone()[0] == 0:
+        for pragma in NEW_DATABASE_PRAGMAS:
+            conn.execute(pragma)
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
     return conn
 
 class JobDB:
+    """Job store with one locked writer connection and a pool of readers.
+
+    WAL mode only lets readers proceed concurrently when they use their own
+    connections, so reads borrow a connection from a bounded pool while all
+    writes are serialized through a single writer.
+    """
     def __init__(self, sqlite_path: str):
         self.sqlite_path = sqlite_path
-        self.pool = ConnectionPool(sqlite_path)
+        self._write_lock = threading.Lock()
+        self._writer = get_conn(sqlite_path)
+        self._writes_since_checkpoint = 0
+        # Every connection to :memory: is a separate database, so reads there use the writer
+        self.pool = None if sqlite_path == ":memory:" else ConnectionPool(sqlite_path, READER_POOL_SIZE)
         self.ensure_schema()
 
-    def ensure_schema(self):
+    @contextmanager
+    def _reader(self):
+        """Borrow a reader connection for the duration of a query"""
+        if self.pool is None:
+            with self._write_lock:
+                yield self._writer
+            return
         with self.pool.get_connection() as conn:
-            conn.executescript(DB_SCHEMA)
+            yield conn
+
+    def ensure_schema(self):
+        with self._write_lock:
+            self._writer.executescript(DB_SCHEMA)
             logger.info("Database schema initialized successfully")
 
     @contextmanager
     def transaction(self):
         """Context manager for database transactions with rollback support"""
-        with self.pool.get_connection() as conn:
+        with self._write_lock:
+            conn = self._writer
             try:
                 conn.execute("BEGIN TRANSACTION")
                 yield conn
@@ -147,6 +220,25 @@ class JobDB:
                 conn.execute("ROLLBACK")
                 logger.error(f"Transaction rolled back due to error: {e}")
                 raise
+            self._writes_since_checkpoint += 1
+            if self._writes_since_checkpoint >= WAL_CHECKPOINT_INTERVAL:
+                self._checkpoint(conn)
+
+    def _checkpoint(self, conn: sqlite3.Connection):
+        """Truncate the WAL file and release free pages; caller must hold the write lock"""
+        self._writes_since_checkpoint = 0
+        if self.sqlite_path == ":memory:":
+            return
+        try:
+            busy, _, _ = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+            if busy:
+                # An open reader held the checkpoint back; the next interval retries
+                logger.warning("WAL checkpoint incomplete: database busy")
+            # execute() steps a column-less statement only once, freeing a single page;
+            # executescript() steps it until every free page is released
+            conn.executescript("PRAGMA incremental_vacuum")
+        except sqlite3.Error as e:
+            logger.warning(f"WAL checkpoint failed: {e}")
 
     def create_job(self, input_json: Dict, owner_email: Optional[str]) -> int:
         """Create a new job with input validation"""
@@ -156,7 +248,7 @@ class JobDB:
         if owner_email and not isinstance(owner_email, str):
             raise ValueError("owner_email must be a string")
         
-        now = datetime.utcnow().isoformat()
+        now = _fast_now_iso()
         try:
             with self.transaction() as conn:
                 cur = conn.execute(
@@ -164,8 +256,8 @@ class JobDB:
                     (owner_email, json.dumps(input_json), now)
                 )
                 job_id = cur.lastrowid
-                logger.info(f"Created job {job_id} for owner {owner_email}")
-                return job_id
+            logger.info("Created job %s for owner %s", job_id, owner_email)
+            return job_id
         except Exception as e:
             logger.error(f"Failed to create job: {e}")
             raise
@@ -175,28 +267,14 @@ class JobDB:
         # Input validation
         if not isinstance(job_id, int) or job_id <= 0:
             raise ValueError("job_id must be a positive integer")
-        if not isinstance(status, str) or status not in ["queued", "running", "finished", "failed"]:
+        if not isinstance(status, str) or status not in JOB_STATUSES:
             raise ValueError("status must be one of: queued, running, finished, failed")
         
-        now = datetime.utcnow().isoformat()
+        now = _fast_now_iso()
         try:
             with self.transaction() as conn:
-                if status == "running":
-                    conn.execute(
-                        "UPDATE jobs SET status=?, started_at=? WHERE id=?",
-                        (status, now, job_id)
-                    )
-                elif status in ("finished", "failed"):
-                    conn.execute(
-                        "UPDATE jobs SET status=?, finished_at=?, error_msg=? WHERE id=?",
-                        (status, now, error_msg, job_id)
-                    )
-                else:
-                    conn.execute(
-                        "UPDATE jobs SET status=? WHERE id=?",
-                        (status, job_id)
-                    )
-                logger.info(f"Updated job {job_id} status to {status}")
+                conn.execute(*_status_update("jobs", job_id, status, error_msg, now))
+            logger.info("Updated job %s status to %s", job_id, status)
         except Exception as e:
             logger.error(f"Failed to update job {job_id} status: {e}")
             raise
@@ -212,40 +290,55 @@ class JobDB:
                     "UPDATE jobs SET result_json=? WHERE id=?",
                     (json.dumps(result), job_id)
                 )
-                logger.info(f"Saved result for job {job_id}")
+            logger.info("Saved result for job %s", job_id)
         except Exception as e:
             logger.error(f"Failed to save result for job {job_id}: {e}")
             raise
 
-    def get_job(self, job_id: int) -> Optional[Dict]:
+    def get_job(self, job_id: int) -> Optional[sqlite3.Row]:
         """Get job by ID with validation"""
         if not isinstance(job_id, int) or job_id <= 0:
             raise ValueError("job_id must be a positive integer")
         
         try:
-            with self.pool.get_connection() as conn:
+            with self._reader() as conn:
                 cur = conn.execute("SELECT * FROM jobs WHERE id=?", (job_id,))
                 row = cur.fetchone()
-                return dict(row) if row else None
+                return row
         except Exception as e:
             logger.error(f"Failed to get job {job_id}: {e}")
             raise
 
-    def list_jobs(self, owner_email: Optional[str] = None) -> List[Dict]:
+    def list_jobs(self, owner_email: Optional[str] = None) -> List[sqlite3.Row]:
         """List jobs with optional owner filter"""
         try:
-            with self.pool.get_connection() as conn:
+            with self._reader() as conn:
                 if owner_email:
                     if not isinstance(owner_email, str):
                         raise ValueError("owner_email must be a string")
                     cur = conn.execute("SELECT * FROM jobs WHERE owner_email=? ORDER BY id DESC", (owner_email,))
                 else:
                     cur = conn.execute("SELECT * FROM jobs ORDER BY id DESC")
-                return [dict(row) for row in cur.fetchall()]
+                return cur.fetchall()
         except Exception as e:
             logger.error(f"Failed to list jobs: {e}")
             raise
 
+    def list_job_ids(self, owner_email: Optional[str] = None) -> List[int]:
+        """List job IDs with optional owner filter, without loading the other columns"""
+        try:
+            with self._reader() as conn:
+                if owner_email:
+                    if not isinstance(owner_email, str):
+                        raise ValueError("owner_email must be a string")
+                    cur = conn.execute("SELECT id FROM jobs WHERE owner_email=? ORDER BY id DESC", (owner_email,))
+                else:
+                    cur = conn.execute("SELECT id FROM jobs ORDER BY id DESC")
+                return [row[0] for row in cur.fetchall()]
+        except Exception as e:
+            logger.error(f"Failed to list job ids: {e}")
+            raise
+
     def create_batch(self, job_id: int, batch_index: int, input_path: str) -> int:
         """Create a new batch with validation"""
         # Input validation
@@ -263,8 +356,8 @@ class JobDB:
                     (job_id, batch_index, input_path)
                 )
                 batch_id = cur.lastrowid
-                logger.info(f"Created batch {batch_id} for job {job_id}")
-                return batch_id
+            logger.info("Created batch %s for job %s", batch_id, job_id)
+            return batch_id
         except Exception as e:
             logger.error(f"Failed to create batch for job {job_id}: {e}")
             raise
@@ -274,28 +367,14 @@ class JobDB:
         # Input validation
         if not isinstance(batch_id, int) or batch_id <= 0:
             raise ValueError("batch_id must be a positive integer")
-        if not isinstance(status, str) or status not in ["pending", "running", "finished", "failed"]:
+        if not isinstance(status, str) or status not in BATCH_STATUSES:
             raise ValueError("status must be one of: pending, running, finished, failed")
         
-        now = datetime.utcnow().isoformat()
+        now = _fast_now_iso()
         try:
             with self.transaction() as conn:
-                if status == "running":
-                    conn.execute(
-                        "UPDATE batches SET status=?, started_at=? WHERE id=?",
-                        (status, now, batch_id)
-                    )
-                elif status in ("finished", "failed"):
-                    conn.execute(
-                        "UPDATE batches SET status=?, finished_at=?, error_msg=? WHERE id=?",
-                        (status, now, error_msg, batch_id)
-                    )
-                else:
-                    conn.execute(
-                        "UPDATE batches SET status=? WHERE id=?",
-                        (status, batch_id)
-                    )
-                logger.info(f"Updated batch {batch_id} status to {status}")
+                conn.execute(*_status_update("batches", batch_id, status, error_msg, now))
+            logger.info("Updated batch %s status to %s", batch_id, status)
         except Exception as e:
             logger.error(f"Failed to update batch {batch_id} status: {e}")
             raise
@@ -313,55 +392,59 @@ class JobDB:
                     "UPDATE batches SET output_path=? WHERE id=?",
                     (output_path, batch_id)
                 )
-                logger.info(f"Saved output path for batch {batch_id}")
+            logger.info("Saved output path for batch %s", batch_id)
         except Exception as e:
             logger.error(f"Failed to save output path for batch {batch_id}: {e}")
             raise
 
-    def get_batches(self, job_id: int) -> List[Dict]:
+    def get_batches(self, job_id: int) -> List[sqlite3.Row]:
         """Get all batches for a job with validation"""
         if not isinstance(job_id, int) or job_id <= 0:
             raise ValueError("job_id must be a positive integer")
         
         try:
-            with self.pool.get_connection() as conn:
+            with self._reader() as conn:
                 cur = conn.execute("SELECT * FROM batches WHERE job_id=? ORDER BY batch_index ASC", (job_id,))
-                return [dict(row) for row in cur.fetchall()]
+                return cur.fetchall()
         except Exception as e:
             logger.error(f"Failed to get batches for job {job_id}: {e}")
             raise
 
-    def get_pending_batches(self, job_id: int) -> List[Dict]:
+    def get_pending_batches(self, job_id: int) -> List[sqlite3.Row]:
         """Get pending batches for a job with validation"""
         if not isinstance(job_id, int) or job_id <= 0:
             raise ValueError("job_id must be a positive integer")
         
         try:
-            with self.pool.get_connection() as conn:
+            with self._reader() as conn:
                 cur = conn.execute(
                     "SELECT * FROM batches WHERE job_id=? AND status IN ('pending','failed') ORDER BY batch_index ASC",
                     (job_id,)
                 )
-                return [dict(row) for row in cur.fetchall()]
+                return cur.fetchall()
         except Exception as e:
             logger.error(f"Failed to get pending batches for job {job_id}: {e}")
             raise
 
-    def get_batch(self, batch_id: int) -> Optional[Dict]:
+    def get_batch(self, batch_id: int) -> Optional[sqlite3.Row]:
         """Get batch by ID with validation"""
         if not isinstance(batch_id, int) or batch_id <= 0:
             raise ValueError("batch_id must be a positive integer")
         
         try:
-            with self.pool.get_connection() as conn:
+            with self._reader() as conn:
                 cur = conn.execute("SELECT * FROM batches WHERE id=?", (batch_id,))
                 row = cur.fetchone()
-                return dict(row) if row else None
+                return row
         except Exception as e:
             logger.error(f"Failed to get batch {batch_id}: {e}")
             raise
 
     def close(self):
         """Close all database connections"""
-        self.pool.close_all()
-        logger.info("Database connections closed")
\ No newline at end of file
+        if self.pool is not None:
+            self.pool.close_all()
+        with self._write_lock:
+            self._writer.close()
+        logger.info("Database connections closed")
+
@@ -18,11 +18,14 @@ from llama_index.llms.openai import OpenAI
 from src.crawler.linkedin import run_linkedin_crawler
 from src.agent import run_agent
 from src.schemas import ActorInput
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
 
 if TYPE_CHECKING:
     from llama_index.core.chat_engine.types import AgentChatResponse
 
+# Built once so each run reuses the compiled validator
+_INPUT_ADAPTER = TypeAdapter(ActorInput)
+
 
 async def main(adapter):
     """
@@ -39,7 +42,7 @@ async def main(adapter):
             raw_input["query"] = " ".join(csv_urls)
 
         try:
-            data = ActorInput.model_validate(raw_input or {})
+            data = _INPUT_ADAPTER.validate_python(raw_input or {})
         except ValidationError as e:
             await adapter.fail('Invalid input', e)
             return
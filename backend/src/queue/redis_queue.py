@@ -3,19 +3,34 @@
 import redis
 import json
 import os
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+
+# Upper bound on sockets a queue opens; callers past it wait for a free connection
+REDIS_MAX_CONNECTIONS = int(os.environ.get("REDIS_MAX_CONNECTIONS", "100"))
 
 class RedisQueue:
     def __init__(self, redis_url: Optional[str] = None, queue_name: str = "job_queue"):
         self.redis_url = redis_url or os.environ.get("REDIS_URL", "redis://localhost:6379/0")
         self.queue_name = queue_name
-        self.redis = redis.Redis.from_url(self.redis_url)
+        self.pool = redis.BlockingConnectionPool.from_url(
+            self.redis_url,
+            max_connections=REDIS_MAX_CONNECTIONS,
+            socket_keepalive=True,
+        )
+        self.redis = redis.Redis(connection_pool=self.pool)
 
     def enqueue(self, job: Dict[str, Any]) -> str:
         job_json = json.dumps(job)
         self.redis.rpush(self.queue_name, job_json)
         return job.get("job_id") or "unknown"
 
+    def enqueue_many(self, jobs: List[Dict[str, Any]]) -> List[str]:
+        # One variadic RPUSH puts every job on the queue in a single round-trip
+        if not jobs:
+            return []
+        self.redis.rpush(self.queue_name, *(json.dumps(job) for job in jobs))
+        return [job.get("job_id") or "unknown" for job in jobs]
+
     def dequeue(self) -> Optional[Dict[str, Any]]:
         job_json = self.redis.blpop(self.queue_name, timeout=10)
         if job_json:
@@ -1,8 +1,11 @@
-from pydantic import BaseModel, Field, ValidationError
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
 
 class ActorInput(BaseModel):
     """Input schema for the crawler."""
 
+    # Inputs are read-only after validation; frozen instances are also hashable
+    model_config = ConfigDict(frozen=True)
+
     query: str = Field(..., description="LinkedIn URLs separated by whitespace")
     modelName: str = Field(default="gpt-4o", description="OpenAI model name")
     maxDepth: int = Field(default=2, ge=1, description="Crawling depth")
@@ -1,18 +1,24 @@
 # Enhanced FastAPI REST API with rate limiting, security, and error handling
 # Place in src/server.py
+import asyncio
 import os
 import json
 import time
+import hashlib
 import logging
+import stat
+from pathlib import Path
 from collections import defaultdict, deque
 from fastapi import FastAPI, File, UploadFile, Form, Request, HTTPException, Depends, Header
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.base import BaseHTTPMiddleware
-from typing import Optional, List
-import shutil
+from typing import Optional, List, Tuple
 import uuid
-from jose import jwt, JWTError
+import aiofiles
+from cachetools import TTLCache
+import jwt
+from jwt import InvalidTokenError as JWTError
 import re
 
 # Configure structured logging
@@ -31,10 +37,26 @@ SQLITE_PATH = os.environ.get("SQLITE_PATH", "/app/data/jobs.db")
 JOBS_DIR = os.environ.get("JOBS_DIR", "/app/data/jobs")
 
 SUPABASE_JWT_SECRET = os.environ.get("SUPABASE_JWT_SECRET", "changeme")
+_JWT_SECRET = SUPABASE_JWT_SECRET.encode()
+
+# Verified token payloads keyed by token hash, so repeat requests skip the HMAC check and decoding
+JWT_CACHE_TTL = 30  # seconds
+# Only touched from the event loop (verify_admin is async), so no lock is needed
+_jwt_cache = TTLCache(maxsize=10_000, ttl=JWT_CACHE_TTL)
+
+# Upload file types accepted by /submit
+ALLOWED_UPLOAD_EXTENSIONS = frozenset({".csv", ".xlsx"})
+# Upload files are copied to disk in chunks of this many bytes
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Input validation patterns, compiled once instead of looked up in re's cache per call
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_CONTROL_CHARS_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]')
 
 # Rate limiting configuration
 RATE_LIMIT_REQUESTS = int(os.environ.get("RATE_LIMIT_REQUESTS", "100"))  # requests per window
 RATE_LIMIT_WINDOW = int(os.environ.get("RATE_LIMIT_WINDOW", "3600"))     # window in seconds (1 hour)
+RATE_LIMIT_EXEMPT_PATHS = frozenset({"/health", "/", "/docs", "/openapi.json"})
 
 # CORS configuration
 ALLOWED_ORIGINS = os.environ.get("ALLOWED_ORIGINS", "http://localhost:3000,http://localhost:5173").split(",")
@@ -55,9 +77,10 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         if auth_header.startswith("Bearer "):
             try:
                 token = auth_header.split(" ", 1)[1]
-                payload = jwt.decode(token, SUPABASE_JWT_SECRET, algorithms=["HS256"])
+                # Shares verify_admin's cache, so a request verifies its token at most once
+                payload, _ = decode_token(token)
                 return f"user:{payload.get('sub', 'unknown')}"
-            except:
+            except JWTError:
                 pass
         
         # Fall back to IP address
@@ -68,11 +91,13 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
     
     def _is_rate_limited(self, client_id: str) -> bool:
         """Check if client is rate limited"""
-        now = time.time()
+        # Monotonic, so wall-clock adjustments cannot reset or extend a window
+        now = time.monotonic()
+        cutoff = now - self.window_seconds
         client_requests = self.clients[client_id]
         
         # Remove old requests outside the window
-        while client_requests and client_requests[0] <= now - self.window_seconds:
+        while client_requests and client_requests[0] <= cutoff:
             client_requests.popleft()
         
         # Check if limit exceeded
@@ -84,8 +109,8 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         return False
     
     async def dispatch(self, request: Request, call_next):
-        # Skip rate limiting for health checks
-        if request.url.path in ["/health", "/", "/docs", "/openapi.json"]:
+        # Skip rate limiting (and token decoding) for health checks and CORS preflights
+        if request.method == "OPTIONS" or request.url.path in RATE_LIMIT_EXEMPT_PATHS:
             return await call_next(request)
         
         client_id = self._get_client_id(request)
@@ -101,8 +126,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
 
 def validate_email(email: str) -> bool:
     """Validate email format"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
+    return bool(_EMAIL_RE.match(email))
 
 def sanitize_string(value: str, max_length: int = 1000) -> str:
     """Sanitize string input"""
@@ -110,7 +134,7 @@ def sanitize_string(value: str, max_length: int = 1000) -> str:
         raise ValueError("Value must be a string")
     
     # Remove null bytes and control characters
-    sanitized = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]', '', value)
+    sanitized = _CONTROL_CHARS_RE.sub('', value)
     
     # Limit length
     if len(sanitized) > max_length:
@@ -118,25 +142,55 @@ def sanitize_string(value: str, max_length: int = 1000) -> str:
     
     return sanitized.strip()
 
-def verify_admin(authorization: str = Header(...)):
+def _has_admin_role(app_metadata, role) -> bool:
+    """Check the Supabase role claims without normalizing them into a list"""
+    if role == "admin":
+        return True
+    if not isinstance(app_metadata, dict):
+        return False
+    roles = app_metadata.get("roles")
+    if isinstance(roles, str):
+        return roles == "admin"
+    return bool(roles) and "admin" in roles
+
+def decode_token(token: str) -> Tuple[dict, bool]:
+    """Verify a JWT and return its payload and whether it grants admin access.
+
+    Tokens must carry an ``exp`` claim. Successful verifications are cached for
+    JWT_CACHE_TTL seconds, but never past the token's own expiry. Invalid tokens
+    raise JWTError and are not cached.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    entry = _jwt_cache.get(key)
+    if entry is not None:
+        return entry
+
+    payload = jwt.decode(
+        token,
+        _JWT_SECRET,
+        algorithms=["HS256"],
+        options={"require": ["exp"], "verify_aud": False},
+    )
+    entry = (payload, _has_admin_role(payload.get("app_metadata"), payload.get("role")))
+
+    if payload["exp"] - time.time() > JWT_CACHE_TTL:
+        _jwt_cache[key] = entry
+    return entry
+
+async def verify_admin(authorization: str = Header(...)):
     if not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Invalid authorization header")
     token = authorization.split(" ", 1)[1]
     try:
-        payload = jwt.decode(token, SUPABASE_JWT_SECRET, algorithms=["HS256"])
+        payload, is_admin = decode_token(token)
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
-    roles = []
-    app_meta = payload.get("app_metadata") or {}
-    if isinstance(app_meta, dict):
-        roles = app_meta.get("roles", [])
-    if isinstance(roles, str):
-        roles = [roles]
-    if "admin" not in roles and payload.get("role") != "admin":
+    if not is_admin:
         raise HTTPException(status_code=403, detail="Admin access required")
     return payload
 
 os.makedirs(JOBS_DIR, exist_ok=True)
+JOBS_DIR_PATH = Path(JOBS_DIR).resolve()
 
 app = FastAPI(
     title="LinkedIn Agent Job Queue API", 
@@ -177,6 +231,9 @@ async def general_exception_handler(request: Request, exc: Exception):
         content={"error": "Internal server error", "detail": "An unexpected error occurred"}
     )
 
+# JobDB and RedisQueue are synchronous and thread-safe; handlers call them through
+# asyncio.to_thread so SQLite I/O (including periodic WAL checkpoints) and Redis
+# round-trips, or waits for a pooled Redis connection, never block the event loop
 jobdb = JobDB(SQLITE_PATH)
 queue = RedisQueue(redis_url=REDIS_URL)
 
@@ -232,24 +289,25 @@ async def submit_job(
                 raise HTTPException(status_code=400, detail="Filename is required")
             
             filename = sanitize_string(input_file.filename, 255)
-            ext = os.path.splitext(filename)[-1].lower()
-            if ext not in [".csv", ".xlsx"]:
+            ext = Path(filename).suffix.lower()
+            if ext not in ALLOWED_UPLOAD_EXTENSIONS:
                 raise HTTPException(status_code=400, detail="Only .csv or .xlsx files are supported")
             
             # Generate secure file path
             file_id = str(uuid.uuid4())
-            input_path = os.path.join(JOBS_DIR, f"{file_id}{ext}")
+            input_path = JOBS_DIR_PATH / f"{file_id}{ext}"
             
             # Ensure path is within JOBS_DIR (prevent directory traversal)
-            if not os.path.abspath(input_path).startswith(os.path.abspath(JOBS_DIR)):
+            if not input_path.is_relative_to(JOBS_DIR_PATH):
                 raise HTTPException(status_code=400, detail="Invalid file path")
             
-            # Save file securely
-            with open(input_path, "wb") as f:
-                shutil.copyfileobj(input_file.file, f)
+            # Save file securely without blocking the event loop
+            async with aiofiles.open(input_path, "wb") as f:
+                while chunk := await input_file.read(UPLOAD_CHUNK_SIZE):
+                    await f.write(chunk)
             
             job_input["inputType"] = "csv" if ext == ".csv" else "excel"
-            job_input["inputPath"] = input_path
+            job_input["inputPath"] = str(input_path)
             logger.info(f"Uploaded file saved: {input_path}")
 
         # Validate and parse input_json
@@ -279,11 +337,13 @@ async def submit_job(
         job_input["maxRetries"] = max_retries or 3
         job_input["timeoutSecs"] = timeout_secs or 60
 
-        # Save to DB and enqueue with transaction
-        job_id = jobdb.create_job(job_input, owner_email)
-        job_input["job_id"] = job_id
-        jobdb.update_job_status(job_id, "queued")
-        queue.enqueue(job_input)
+        # Commit the job row before enqueueing, so the worker never dequeues a job without one
+        job_id = await asyncio.to_thread(jobdb.create_job, job_input, owner_email)
+        try:
+            await asyncio.to_thread(queue.enqueue, {**job_input, "job_id": job_id})
+        except Exception as e:
+            await asyncio.to_thread(jobdb.update_job_status, job_id, "failed", error_msg=f"Failed to queue job: {e}")
+            raise
         
         logger.info(f"Job {job_id} submitted successfully by {owner_email}")
         return {"job_id": job_id, "status": "queued"}
@@ -297,36 +357,45 @@ async def submit_job(
 @app.get("/status/{job_id}")
 async def job_status(job_id: int, user: dict = Depends(verify_admin)):
     """Get job status and stats."""
-    job = jobdb.get_job(job_id)
+    job = await asyncio.to_thread(jobdb.get_job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    batches = jobdb.get_batches(job_id)
+    batches = await asyncio.to_thread(jobdb.get_batches, job_id)
     return {
-        "job": job,
-        "batches": batches
+        "job": dict(job),
+        "batches": [dict(batch) for batch in batches]
     }
 
 @app.get("/result/{job_id}")
 async def get_result(job_id: int, user: dict = Depends(verify_admin)):
     """Download the final Excel result for a completed job."""
-    job = jobdb.get_job(job_id)
+    job = await asyncio.to_thread(jobdb.get_job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     if job["status"] != "finished":
         return JSONResponse({"status": job["status"], "error": "Job not complete yet"}, status_code=202)
     # Output path: {JOBS_DIR}/job_{job_id}_final.xlsx
-    output_path = os.path.normpath(os.path.join(JOBS_DIR, f"job_{job_id}_final.xlsx"))
-    if not output_path.startswith(JOBS_DIR):
+    output_path = JOBS_DIR_PATH / f"job_{job_id}_final.xlsx"
+    if not output_path.is_relative_to(JOBS_DIR_PATH):
         raise HTTPException(status_code=400, detail="Invalid job ID or unauthorized access")
-    if not os.path.isfile(output_path):
+    try:
+        output_stat = output_path.stat()
+    except FileNotFoundError:
+        output_stat = None
+    if output_stat is None or not stat.S_ISREG(output_stat.st_mode):
         return JSONResponse({"error": "Result Excel not found"}, status_code=500)
-    from fastapi.responses import FileResponse
-    return FileResponse(output_path, filename=f"linkedin_results_{job_id}.xlsx", media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+    # Passing the stat result sets Content-Length up front and saves Starlette a second stat
+    return FileResponse(
+        output_path,
+        filename=f"linkedin_results_{job_id}.xlsx",
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        stat_result=output_stat,
+    )
 
 @app.get("/jobs")
 async def list_jobs(email: Optional[str] = None, user: dict = Depends(verify_admin)):
-    jobs = jobdb.list_jobs(owner_email=email)
-    return jobs
+    jobs = await asyncio.to_thread(jobdb.list_jobs, owner_email=email)
+    return [dict(job) for job in jobs]
 
 @app.get("/")
 async def root():
@@ -28,6 +28,7 @@ class JobStorageManager:
             dir_path.mkdir(parents=True, exist_ok=True)
         
         self.log_file = self.logs_dir / "job_manager.log"
+        self._log_handle = None
         
     def _log(self, message: str, level: str = "INFO"):
         """Internal logging with timestamp"""
@@ -35,14 +36,22 @@ class JobStorageManager:
         log_entry = f"[{timestamp}] [{level}] {message}"
         print(log_entry)
         
-        with open(self.log_file, 'a', encoding='utf-8') as f:
-            f.write(log_entry + "\n")
+        # Keep the log open, line-buffered: one write per entry instead of open/write/close
+        if self._log_handle is None:
+            self._log_handle = open(self.log_file, 'a', encoding='utf-8', buffering=1)
+        self._log_handle.write(log_entry + "\n")
+    
+    def close(self):
+        """Close the log file if it was opened"""
+        if self._log_handle is not None:
+            self._log_handle.close()
+            self._log_handle = None
     
     def generate_job_id(self, input_data: str) -> str:
         """Generate a unique job ID based on input and timestamp"""
         timestamp = datetime.now().isoformat()
         combined = f"{input_data}_{timestamp}"
-        return hashlib.md5(combined.encode()).hexdigest()[:12]
+        return hashlib.blake2b(combined.encode(), digest_size=6).hexdigest()
     
     def save_job_result(self, job_result: JobResult) -> str:
         """Save a complete job result with multiple formats"""
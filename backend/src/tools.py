@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import functools
+import json
 import logging
 import os
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, AsyncIterator, Iterable
 
 import polars as pl
 from apify_client import ApifyClientAsync
@@ -15,6 +17,8 @@ client = ApifyClientAsync(token=os.getenv('APIFY_TOKEN'))
 
 CONTACT_DETAILS_ACTOR_ID = 'vdrmota/contact-info-scraper'
 CONTACT_DETAILS_ACTOR_FIELDS = {'depth', 'originalStartUrl', 'url', 'referrerUrl'}
+# Below this many records a plain Python dedup beats building a Polars DataFrame
+POLARS_DEDUP_MIN_RECORDS = 512
 
 PROMPT_SUMMARIZE = PromptTemplate(
     'Scraped contact data is below.\n'
@@ -47,6 +51,38 @@ class LLMRegistry:
         cls._llm = new_llm
 
 
+def _dedup_key(record: dict) -> str:
+    """Build a hashable key from the contact fields of a scraped record."""
+    # Missing and null fields compare equal, as they do after Polars fills in a column
+    contact = {k: v for k, v in record.items() if k not in CONTACT_DETAILS_ACTOR_FIELDS and v is not None}
+    return json.dumps(contact, sort_keys=True, default=str)
+
+
+@functools.lru_cache(maxsize=16)
+def _dedup_columns(columns: frozenset[str]) -> tuple[str, ...]:
+    """Return the contact columns of a scraped dataset, i.e. those not set by the actor itself."""
+    return tuple(sorted(columns - CONTACT_DETAILS_ACTOR_FIELDS))
+
+
+async def _run_contact_details_actor(
+    start_urls: list[dict[str, Any]],
+    max_requests_per_start_url: int,
+    max_depth: int,
+    same_domain: bool,
+) -> str:
+    """Run the Contact Details Scraper and return the ID of its default dataset."""
+    run_input = {
+        'startUrls': start_urls,
+        'maxRequestsPerStartUrl': max_requests_per_start_url,
+        'maxDepth': max_depth,
+        'sameDomain': same_domain,
+    }
+    logger.info('Calling Apify Actor: %s with %d start URLs', CONTACT_DETAILS_ACTOR_ID, len(start_urls))
+    logger.debug('Apify Actor input: %s', run_input)
+    actor_call = await client.actor(CONTACT_DETAILS_ACTOR_ID).call(run_input=run_input)
+    return actor_call['defaultDatasetId']  # type: ignore[index]
+
+
 async def call_contact_details_scraper(
     start_urls: list[dict[str, Any]],
     max_requests_per_start_url: int = 5,
@@ -54,6 +90,7 @@ async def call_contact_details_scraper(
     *,
     same_domain: bool = True,
     deduplicate: bool = True,
+    omit_fields: Iterable[str] = (),
 ) -> list[dict]:
     """Extract contact details from websites using the Apify Actor.
 
@@ -73,6 +110,8 @@ async def call_contact_details_scraper(
         max_depth: Maximum link depth
         same_domain: If set, the scraper will only follow links within the same domain as the referring page.
         deduplicate: If set, this function will deduplicate the results.
+        omit_fields: Fields to leave out of the returned records. They are dropped by the dataset API,
+            so they are never downloaded or held in memory.
 
     Returns:
         List of extracted details
@@ -91,27 +130,66 @@ async def call_contact_details_scraper(
             }
         ]
     """
-    run_input = {
-        'startUrls': start_urls,
-        'maxRequestsPerStartUrl': max_requests_per_start_url,
-        'maxDepth': max_depth,
-        'sameDomain': same_domain,
-    }
-    logger.info(f'Calling Apify Actor: {CONTACT_DETAILS_ACTOR_ID} with input: {run_input}')
-    actor_call = await client.actor(CONTACT_DETAILS_ACTOR_ID).call(run_input=run_input)
-    dataset_items = await client.dataset(actor_call['defaultDatasetId']).list_items(clean=True)  # type: ignore[index]
+    dataset_id = await _run_contact_details_actor(start_urls, max_requests_per_start_url, max_depth, same_domain)
+    dataset_items = await client.dataset(dataset_id).list_items(
+        clean=True,
+        omit=list(omit_fields) or None,
+    )
     data = dataset_items.items
     logger.info('Received data from %s, number of records: %d', CONTACT_DETAILS_ACTOR_ID, len(data))
 
     if deduplicate:
         logger.info('Deduplicating contact information')
-        df_data = pl.from_records(data)
-        columns = list(set(df_data.columns) - CONTACT_DETAILS_ACTOR_FIELDS)
-        data = df_data.unique(subset=columns).to_dicts()
+        if len(data) < POLARS_DEDUP_MIN_RECORDS:
+            unique: dict[str, dict] = {}
+            for record in data:
+                unique.setdefault(_dedup_key(record), record)
+            data = list(unique.values())
+        else:
+            df_data = pl.from_records(data)
+            columns = _dedup_columns(frozenset(df_data.columns))
+            data = df_data.unique(subset=list(columns)).to_dicts()
 
     return data
 
 
+async def stream_contact_details(
+    start_urls: list[dict[str, Any]],
+    max_requests_per_start_url: int = 5,
+    max_depth: int = 2,
+    *,
+    same_domain: bool = True,
+    deduplicate: bool = True,
+    omit_fields: Iterable[str] = (),
+) -> AsyncIterator[dict]:
+    """Yield contact details from the Contact Details Scraper one record at a time.
+
+    Works like `call_contact_details_scraper`, but pages through the resulting dataset instead of
+    downloading it whole, so callers can filter and forward records as they arrive. Deduplication
+    only keeps the keys of records already yielded, not the records themselves.
+
+    Args:
+        start_urls: List of dictionaries containing the URLs to be scraped.
+        max_requests_per_start_url: The maximum number of pages that will be enqueued from each start URL you provide.
+        max_depth: Maximum link depth
+        same_domain: If set, the scraper will only follow links within the same domain as the referring page.
+        deduplicate: If set, records with already seen contact details are skipped.
+        omit_fields: Fields to leave out of the yielded records.
+
+    Yields:
+        Extracted contact details, one record per crawled page.
+    """
+    dataset_id = await _run_contact_details_actor(start_urls, max_requests_per_start_url, max_depth, same_domain)
+    seen: set[str] = set()
+    async for record in client.dataset(dataset_id).iterate_items(clean=True, omit=list(omit_fields) or None):
+        if deduplicate:
+            key = _dedup_key(record)
+            if key in seen:
+                continue
+            seen.add(key)
+        yield record
+
+
 async def summarize_contact_information(contact_information: list[dict]) -> str:
     """Summarize list of scraped contacts from the Contact Details Scraper.
 
@@ -136,4 +214,6 @@ async def summarize_contact_information(contact_information: list[dict]) -> str:
     """
     llm = LLMRegistry.get()
     logger.info('Summarizing contact information')
-    return str(await llm.apredict(PROMPT_SUMMARIZE, scraped_data=contact_information))
+    # Compact JSON is cheaper to build than the template's repr of nested dicts and uses fewer prompt tokens
+    scraped_data = json.dumps(contact_information, separators=(',', ':'), ensure_ascii=False, default=str)
+    return str(await llm.apredict(PROMPT_SUMMARIZE, scraped_data=scraped_data))
@@ -2,7 +2,9 @@
 Direct web scraping alternative that replaces Apify dependency.
 Uses requests + BeautifulSoup for simple scraping without external services.
 """
+import asyncio
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 import time
 from urllib.parse import urljoin
@@ -12,11 +14,17 @@ import re
 
 logger = logging.getLogger(__name__)
 
+# Keep-alive connections held open per host by a scraper session
+HTTP_POOL_MAXSIZE = 100
+
 class SimpleWebScraper:
     def __init__(self, delay: float = 1.0, max_retries: int = 3):
         self.delay = delay
         self.max_retries = max_retries
         self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=HTTP_POOL_MAXSIZE)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
@@ -240,6 +248,15 @@ class SimpleWebScraper:
         
         return ""
 
+_scraper = None
+
+def _get_scraper() -> SimpleWebScraper:
+    """Return the shared scraper, so its session's connections are reused across calls"""
+    global _scraper
+    if _scraper is None:
+        _scraper = SimpleWebScraper()
+    return _scraper
+
 # Async wrapper for compatibility
 async def call_contact_details_scraper(
     start_urls: List[Dict[str, Any]],
@@ -252,7 +269,7 @@ async def call_contact_details_scraper(
     Async wrapper that replaces the Apify contact details scraper.
     This version uses simple web scraping instead of external services.
     """
-    scraper = SimpleWebScraper()
+    scraper = _get_scraper()
     results = []
     
     for url_data in start_urls:
@@ -260,12 +277,13 @@ async def call_contact_details_scraper(
         if not url:
             continue
             
-        logger.info(f"Scraping contact details from: {url}")
-        contact_info = scraper.scrape_contact_details(url)
+        logger.info("Scraping contact details from: %s", url)
+        # requests is blocking, so run the fetch in a thread to keep the event loop free
+        contact_info = await asyncio.to_thread(scraper.scrape_contact_details, url)
         results.append(contact_info)
         
         # Simple rate limiting
-        time.sleep(1)
+        await asyncio.sleep(1)
     
     # Remove duplicates if requested
     if deduplicate:
@@ -279,48 +297,3 @@ async def call_contact_details_scraper(
         results = deduplicated
     
     return results
-
-# Add missing extraction methods
-def _extract_name_simple(soup):
-    """Extract person or company name"""
-    # Try various selectors for names
-    name_selectors = [
-        'h1', 'h2.name', '.name', '.full-name', 
-        '.company-name', '.profile-name', '[data-name]',
-        'title'  # Fallback to page title
-    ]
-    
-    for selector in name_selectors:
-        element = soup.select_one(selector)
-        if element and element.get_text(strip=True):
-            return element.get_text(strip=True)
-    
-    return ""
-
-def _extract_company_simple(soup):
-    """Extract company name"""
-    company_selectors = [
-        '.company', '.company-name', '.organization',
-        '.employer', '[data-company]', '.workplace'
-    ]
-    
-    for selector in company_selectors:
-        element = soup.select_one(selector)
-        if element and element.get_text(strip=True):
-            return element.get_text(strip=True)
-    
-    return ""
-
-def _extract_location_simple(soup):
-    """Extract location information"""
-    location_selectors = [
-        '.location', '.address', '.geo', '.locality',
-        '[data-location]', '.place'
-    ]
-    
-    for selector in location_selectors:
-        element = soup.select_one(selector)
-        if element and element.get_text(strip=True):
-            return element.get_text(strip=True)
-    
-    return ""
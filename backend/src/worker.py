@@ -9,6 +9,7 @@ import logging
 import traceback
 import uuid
 from pathlib import Path
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 import polars as pl
 
@@ -27,6 +28,8 @@ if not JOBS_DIR.startswith(os.path.abspath(_SAFE_JOBS_ROOT)):
     sys.exit(1)
 BATCH_SIZE = 10000
 MAX_RETRIES = 3
+# Upper bound on batches run at once, whatever a job asks for
+MAX_BATCH_CONCURRENCY = 10
 
 os.makedirs(JOBS_DIR, exist_ok=True)
 
@@ -112,7 +115,69 @@ def run_batch(batch_json_path, batch_output_json, batch_output_xlsx):
             f.write(json.dumps({"error": str(e), "traceback": traceback.format_exc()}))
         return False, str(e)
 
-def process_job(job, jobdb: JobDB):
+def process_batch(job, jobdb: JobDB, batch_row, outputs_dir):
+    job_id = job["job_id"]
+    batch_id = batch_row["id"]
+    batch_index = batch_row["batch_index"]
+    input_batch_path = batch_row["input_path"]
+    output_json = os.path.join(outputs_dir, f"batch_{batch_index:04d}_output.json")
+    output_xlsx = os.path.join(outputs_dir, f"batch_{batch_index:04d}_output.xlsx")
+
+    # Skip if already finished
+    if batch_row["status"] == "finished" and Path(output_xlsx).exists():
+        return
+
+    for attempt in range(1, MAX_RETRIES+1):
+        jobdb.update_batch_status(batch_id, "running")
+        logging.info(f"Job {job_id} batch {batch_index} attempt {attempt}")
+        # Prepare batch input json
+        if input_batch_path.endswith(".json"):
+            batch_json_path = input_batch_path
+        else:
+            # Create input json for this batch
+            batch_json_path = os.path.join(outputs_dir, f"batch_{batch_index:04d}_input.json")
+            batch_input = job.copy()
+            batch_input["inputType"] = "csv" if input_batch_path.endswith(".csv") else "excel"
+            batch_input["inputPath"] = input_batch_path
+            with open(batch_json_path, "w") as f:
+                json.dump(batch_input, f)
+        # Run and handle output
+        ok, err = run_batch(batch_json_path, output_json, output_xlsx)
+        if ok:
+            jobdb.update_batch_status(batch_id, "finished")
+            jobdb.save_batch_output(batch_id, output_xlsx)
+            break
+        else:
+            jobdb.update_batch_status(batch_id, "failed", error_msg=err)
+            time.sleep(10 * attempt)
+    # If still not succeeded, mark as failed
+    batch_row = jobdb.get_batch(batch_id)
+    if batch_row["status"] != "finished":
+        logging.error(f"Job {job_id} batch {batch_index} failed after {MAX_RETRIES} attempts.")
+
+def process_batches(job, jobdb: JobDB, executor: ThreadPoolExecutor, outputs_dir):
+    """Run a job's batches on the shared executor, at most the job's concurrency at a time.
+
+    If a batch raises, batches not yet started are cancelled and running ones are
+    waited for before the error propagates, so no work outlives the failed job.
+    """
+    max_in_flight = max(1, min(int(job.get("concurrency") or 1), MAX_BATCH_CONCURRENCY))
+    in_flight = set()
+    try:
+        for batch_row in jobdb.get_batches(job["job_id"]):
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            in_flight.add(executor.submit(process_batch, job, jobdb, batch_row, outputs_dir))
+        for future in wait(in_flight).done:
+            future.result()
+    finally:
+        for future in in_flight:
+            future.cancel()
+        wait(in_flight)
+
+def process_job(job, jobdb: JobDB, executor: ThreadPoolExecutor):
     job_id = job["job_id"]
     input_json = job.copy()
     owner_email = job.get("owner_email")
@@ -145,45 +210,8 @@ def process_job(job, jobdb: JobDB):
     for idx, batch_file in enumerate(batch_files):
         jobdb.create_batch(job_id, idx, batch_file)
 
-    # Process each batch with retries/resume
-    for batch_row in jobdb.get_batches(job_id):
-        batch_id = batch_row["id"]
-        batch_index = batch_row["batch_index"]
-        input_batch_path = batch_row["input_path"]
-        output_json = os.path.join(outputs_dir, f"batch_{batch_index:04d}_output.json")
-        output_xlsx = os.path.join(outputs_dir, f"batch_{batch_index:04d}_output.xlsx")
-
-        # Skip if already finished
-        if batch_row["status"] == "finished" and Path(output_xlsx).exists():
-            continue
-
-        for attempt in range(1, MAX_RETRIES+1):
-            jobdb.update_batch_status(batch_id, "running")
-            logging.info(f"Job {job_id} batch {batch_index} attempt {attempt}")
-            # Prepare batch input json
-            if input_batch_path.endswith(".json"):
-                batch_json_path = input_batch_path
-            else:
-                # Create input json for this batch
-                batch_json_path = os.path.join(outputs_dir, f"batch_{batch_index:04d}_input.json")
-                batch_input = job.copy()
-                batch_input["inputType"] = "csv" if input_batch_path.endswith(".csv") else "excel"
-                batch_input["inputPath"] = input_batch_path
-                with open(batch_json_path, "w") as f:
-                    json.dump(batch_input, f)
-            # Run and handle output
-            ok, err = run_batch(batch_json_path, output_json, output_xlsx)
-            if ok:
-                jobdb.update_batch_status(batch_id, "finished")
-                jobdb.save_batch_output(batch_id, output_xlsx)
-                break
-            else:
-                jobdb.update_batch_status(batch_id, "failed", error_msg=err)
-                time.sleep(10 * attempt)
-        # If still not succeeded, mark as failed
-        batch_row = jobdb.get_batch(batch_id)
-        if batch_row["status"] != "finished":
-            logging.error(f"Job {job_id} batch {batch_index} failed after {MAX_RETRIES} attempts.")
+    # Process batches with retries/resume
+    process_batches(job, jobdb, executor, outputs_dir)
 
     # After all batches, merge results
     batch_outputs = [row["output_path"] for row in jobdb.get_batches(job_id) if row["status"] == "finished" and row["output_path"]]
@@ -206,6 +234,8 @@ def process_job(job, jobdb: JobDB):
 def main():
     jobdb = JobDB(SQLITE_PATH)
     queue = RedisQueue(redis_url=REDIS_URL)
+    # One pool for the worker's lifetime; threads are reused across jobs
+    executor = ThreadPoolExecutor(max_workers=MAX_BATCH_CONCURRENCY)
     logging.info("Worker started, waiting for jobs...")
     while True:
         job = queue.dequeue()
@@ -216,7 +246,7 @@ def main():
         logging.info(f"Dequeued job {job_id}")
         jobdb.update_job_status(job_id, "running")
         try:
-            process_job(job, jobdb)
+            process_job(job, jobdb, executor)
         except Exception as e:
             logging.error(f"Job {job_id} failed: {e}")
             jobdb.update_job_status(job_id, "failed", error_msg=str(e))
@@ -1,8 +1,9 @@
 import os
 import sys
+import time
 from pathlib import Path
 from fastapi.testclient import TestClient
-from jose import jwt
+import jwt
 
 # Set secret before importing app
 os.environ["SUPABASE_JWT_SECRET"] = "testsecret"
@@ -13,7 +14,7 @@ from src.server import app, jobdb
 client = TestClient(app)
 
 def create_token(admin: bool):
-    payload = {"sub": "123", "email": "user@example.com"}
+    payload = {"sub": "123", "email": "user@example.com", "exp": int(time.time()) + 3600}
     if admin:
         payload["app_metadata"] = {"roles": ["admin"]}
     token = jwt.encode(payload, os.environ["SUPABASE_JWT_SECRET"], algorithm="HS256")
@@ -38,3 +39,15 @@ def test_admin_token():
     r = client.get("/jobs", headers={"Authorization": f"Bearer {token}"})
     assert r.status_code == 200
 
+
+def test_cached_token_keeps_role_check():
+    token = create_token(False)
+    for _ in range(2):
+        r = client.get("/jobs", headers={"Authorization": f"Bearer {token}"})
+        assert r.status_code == 403
+
+def test_token_without_exp_rejected():
+    payload = {"sub": "123", "app_metadata": {"roles": ["admin"]}}
+    token = jwt.encode(payload, os.environ["SUPABASE_JWT_SECRET"], algorithm="HS256")
+    r = client.get("/jobs", headers={"Authorization": f"Bearer {token}"})
+    assert r.status_code == 401
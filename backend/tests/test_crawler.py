@@ -0,0 +1,124 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from apify_client._errors import ApifyApiError
+
+import src.tools as tools
+from src.crawler import linkedin
+
+
+def api_error(status_code: int) -> ApifyApiError:
+    request = httpx.Request("GET", "https://api.apify.com/v2/acts")
+    return ApifyApiError(httpx.Response(status_code, request=request, json={"error": {"message": "m", "type": "t"}}), 1)
+
+
+@pytest.mark.parametrize("error", [
+    httpx.ConnectError("refused"),
+    httpx.ReadTimeout("slow"),
+    asyncio.TimeoutError(),
+    api_error(502),
+    api_error(429),
+])
+def test_transient_scraper_errors_are_retried(error):
+    assert linkedin._is_transient_scraper_error(error)
+
+
+@pytest.mark.parametrize("error", [api_error(401), api_error(400), ValueError("bug")])
+def test_permanent_scraper_errors_are_not_retried(error):
+    assert not linkedin._is_transient_scraper_error(error)
+
+
+def test_scrape_chunk_retries_only_transient_failures(monkeypatch):
+    failures = [httpx.ConnectError("refused")]
+    calls = []
+
+    async def fake_stream(start_urls, **kwargs):
+        calls.append(start_urls)
+        if failures:
+            raise failures.pop()
+        yield {"url": start_urls[0]["url"], "emails": ["a@example.com"]}
+
+    async def no_sleep(_):
+        pass
+
+    monkeypatch.setattr(tools, "stream_contact_details", fake_stream)
+    monkeypatch.setattr(linkedin.asyncio, "sleep", no_sleep)
+
+    records = asyncio.run(linkedin._scrape_chunk([{"url": "https://a"}], 1, True))
+    assert records == [{"url": "https://a", "emails": ["a@example.com"]}]
+    assert len(calls) == 2
+
+    failures.append(api_error(401))
+    calls.clear()
+    with pytest.raises(ApifyApiError):
+        asyncio.run(linkedin._scrape_chunk([{"url": "https://a"}], 1, True))
+    assert len(calls) == 1
+
+
+def test_legacy_crawler_dedupes_across_chunks(monkeypatch):
+    async def fake_scrape(start_urls, max_depth, include_socials):
+        return [{"url": u["url"], "emails": ["same@example.com"]} for u in start_urls]
+
+    monkeypatch.setattr(linkedin, "SCRAPER_CHUNK_SIZE", 1)
+    monkeypatch.setattr(linkedin, "_scrape_chunk", fake_scrape)
+    query = "https://a.example https://b.example"
+
+    result = asyncio.run(linkedin.run_linkedin_crawler_legacy(query))
+    assert result["results"] == [{"url": "https://a.example", "emails": ["same@example.com"]}]
+
+
+def test_legacy_crawler_cancels_other_chunks_on_failure(monkeypatch):
+    cancelled = []
+
+    async def fake_scrape(start_urls, max_depth, include_socials):
+        if start_urls[0]["url"] == "https://a.example":
+            raise api_error(401)
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(start_urls[0]["url"])
+            raise
+        return []
+
+    monkeypatch.setattr(linkedin, "SCRAPER_CHUNK_SIZE", 1)
+    monkeypatch.setattr(linkedin, "_scrape_chunk", fake_scrape)
+
+    with pytest.raises(ApifyApiError):
+        asyncio.run(linkedin.run_linkedin_crawler_legacy("https://a.example https://b.example"))
+    assert cancelled == ["https://b.example"]
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://www.linkedin.com/in/foo/?trk=a&x=1", "https://www.linkedin.com/in/foo?x=1"),
+    ("https://www.linkedin.com/in/foo?trk=a#top", "https://www.linkedin.com/in/foo#top"),
+    ("https://uk.linkedin.com/company/bar/?originalSubdomain=uk", "https://uk.linkedin.com/company/bar"),
+    ("https://www.linkedin.com/in/foo?x=1/", "https://www.linkedin.com/in/foo?x=1/"),
+    ("https://example.com/path/?q=1/", "https://example.com/path/?q=1/"),
+    ("https://example.com/p?trk=a", "https://example.com/p?trk=a"),
+    ("https://linkedin.com.example.com/p?trk=a", "https://linkedin.com.example.com/p?trk=a"),
+    ("https://linkedin.com](https://linkedin.com)", "https://linkedin.com](https://linkedin.com)"),
+])
+def test_canonical_url(url, expected):
+    assert linkedin._canonical_url(url) == expected
+
+
+def test_unique_urls_keeps_markdown_pasted_urls():
+    urls = linkedin._URL_RE.findall("[https://linkedin.com](https://linkedin.com)")
+    assert linkedin._unique_urls(urls) == urls
+
+
+def test_legacy_crawler_failure_is_not_chained_to_the_group(monkeypatch):
+    async def fake_scrape(start_urls, max_depth, include_socials):
+        raise api_error(401)
+
+    monkeypatch.setattr(linkedin, "_scrape_chunk", fake_scrape)
+
+    with pytest.raises(ApifyApiError) as excinfo:
+        asyncio.run(linkedin.run_linkedin_crawler_legacy("https://a.example"))
+    assert excinfo.value.__suppress_context__
@@ -0,0 +1,82 @@
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.database import JobDB, READER_POOL_SIZE
+
+
+@pytest.fixture
+def jobdb(tmp_path):
+    db = JobDB(str(tmp_path / "jobs.db"))
+    yield db
+    db.close()
+
+
+def test_reads_use_pooled_connection_not_writer(jobdb):
+    job_id = jobdb.create_job({"query": "q"}, "a@example.com")
+    with jobdb.pool.get_connection() as conn:
+        assert conn is not jobdb._writer
+        assert conn.execute("SELECT owner_email FROM jobs WHERE id=?", (job_id,)).fetchone()[0] == "a@example.com"
+
+
+def test_reads_do_not_wait_for_write_lock(jobdb):
+    job_id = jobdb.create_job({"query": "q"}, None)
+    result = {}
+
+    def read():
+        result["job"] = jobdb.get_job(job_id)
+
+    with jobdb._write_lock:
+        reader = threading.Thread(target=read)
+        reader.start()
+        reader.join(timeout=5)
+        assert not reader.is_alive()
+    assert result["job"]["id"] == job_id
+
+
+def test_concurrent_writes_are_serialized(jobdb):
+    threads = [threading.Thread(target=jobdb.create_job, args=({"n": i}, None)) for i in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(jobdb.list_job_ids()) == list(range(1, 21))
+
+
+def test_reader_connections_stay_bounded(jobdb):
+    job_id = jobdb.create_job({"query": "q"}, None)
+
+    def read():
+        for _ in range(20):
+            jobdb.get_job(job_id)
+
+    for _ in range(5):
+        threads = [threading.Thread(target=read) for _ in range(READER_POOL_SIZE)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    assert jobdb.pool.pool.qsize() == READER_POOL_SIZE
+
+
+def test_memory_database_reads_through_writer():
+    db = JobDB(":memory:")
+    job_id = db.create_job({"query": "q"}, None)
+    db.update_job_status(job_id, "running")
+    assert db.get_job(job_id)["status"] == "running"
+    db.close()
+
+
+def test_checkpoint_releases_free_pages(jobdb):
+    job_ids = [jobdb.create_job({"blob": "x" * 4000}, None) for _ in range(50)]
+    with jobdb.transaction() as conn:
+        conn.execute("DELETE FROM jobs WHERE id BETWEEN ? AND ?", (job_ids[0], job_ids[-1]))
+    with jobdb._write_lock:
+        assert jobdb._writer.execute("PRAGMA freelist_count").fetchone()[0] > 1
+        jobdb._checkpoint(jobdb._writer)
+        assert jobdb._writer.execute("PRAGMA freelist_count").fetchone()[0] == 0
+
@@ -0,0 +1,41 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.queue.redis_queue import RedisQueue
+
+
+class FakeRedis:
+    def __init__(self):
+        self.lists = {}
+        self.rpush_calls = 0
+
+    def rpush(self, name, *values):
+        self.rpush_calls += 1
+        self.lists.setdefault(name, []).extend(values)
+        return len(self.lists[name])
+
+
+def make_queue():
+    # Creating the client does not connect, so no server is needed
+    queue = RedisQueue("redis://localhost:6379/0", queue_name="jobs")
+    queue.redis = FakeRedis()
+    return queue
+
+
+def test_enqueue_many_pushes_all_jobs_in_one_call():
+    queue = make_queue()
+    jobs = [{"job_id": 1, "query": "a"}, {"job_id": 2, "query": "b"}, {"query": "c"}]
+
+    assert queue.enqueue_many(jobs) == [1, 2, "unknown"]
+    assert queue.redis.rpush_calls == 1
+    assert [json.loads(v) for v in queue.redis.lists["jobs"]] == jobs
+
+
+def test_enqueue_many_with_no_jobs_skips_redis():
+    queue = make_queue()
+
+    assert queue.enqueue_many([]) == []
+    assert queue.redis.rpush_calls == 0
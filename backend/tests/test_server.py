@@ -0,0 +1,82 @@
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+import jwt
+import pytest
+from fastapi.testclient import TestClient
+
+# Set secret before importing app
+os.environ["SUPABASE_JWT_SECRET"] = "testsecret"
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import src.server as server
+from src.database import JobDB
+
+client = TestClient(server.app)
+
+
+def admin_headers():
+    payload = {"sub": "123", "app_metadata": {"roles": ["admin"]}, "exp": int(time.time()) + 3600}
+    return {"Authorization": f"Bearer {jwt.encode(payload, os.environ['SUPABASE_JWT_SECRET'], algorithm='HS256')}"}
+
+
+class RecordingQueue:
+    def __init__(self, jobdb, error=None):
+        self.jobdb = jobdb
+        self.error = error
+        self.jobs = []
+        self.ran_on_event_loop = False
+
+    def enqueue(self, job):
+        try:
+            asyncio.get_running_loop()
+            self.ran_on_event_loop = True
+        except RuntimeError:
+            pass
+        # The row must already be committed and visible to the worker's reads
+        assert self.jobdb.get_job(job["job_id"])["status"] == "queued"
+        if self.error:
+            raise self.error
+        self.jobs.append(job)
+        return job["job_id"]
+
+
+@pytest.fixture
+def jobdb(tmp_path, monkeypatch):
+    db = JobDB(str(tmp_path / "jobs.db"))
+    monkeypatch.setattr(server, "jobdb", db)
+    yield db
+    db.close()
+
+
+def submit():
+    return client.post(
+        "/submit",
+        data={"owner_email": "a@example.com", "input_json": '{"query": "https://example.com"}'},
+        headers=admin_headers(),
+    )
+
+
+def test_submit_enqueues_committed_job(jobdb, monkeypatch):
+    queue = RecordingQueue(jobdb)
+    monkeypatch.setattr(server, "queue", queue)
+
+    r = submit()
+    assert r.status_code == 200
+    job_id = r.json()["job_id"]
+    assert [job["job_id"] for job in queue.jobs] == [job_id]
+    assert not queue.ran_on_event_loop
+    assert jobdb.get_job(job_id)["status"] == "queued"
+
+
+def test_submit_marks_job_failed_when_enqueue_fails(jobdb, monkeypatch):
+    monkeypatch.setattr(server, "queue", RecordingQueue(jobdb, error=ConnectionError("redis down")))
+
+    r = submit()
+    assert r.status_code == 500
+    job = jobdb.get_job(jobdb.list_job_ids()[0])
+    assert job["status"] == "failed"
+    assert "redis down" in job["error_msg"]
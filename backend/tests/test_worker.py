@@ -0,0 +1,67 @@
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import src.worker as worker
+
+
+class FakeJobDB:
+    def __init__(self, count):
+        self.rows = [{"id": i + 1, "batch_index": i} for i in range(count)]
+
+    def get_batches(self, job_id):
+        return self.rows
+
+
+@pytest.fixture
+def executor():
+    pool = ThreadPoolExecutor(max_workers=worker.MAX_BATCH_CONCURRENCY)
+    yield pool
+    pool.shutdown(wait=True)
+
+
+def test_process_batches_respects_job_concurrency(monkeypatch, executor):
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def fake_batch(job, jobdb, batch_row, outputs_dir):
+        with lock:
+            running.append(batch_row["id"])
+            peak.append(len(running))
+        time.sleep(0.02)
+        with lock:
+            running.remove(batch_row["id"])
+
+    monkeypatch.setattr(worker, "process_batch", fake_batch)
+    worker.process_batches({"job_id": 1, "concurrency": 3}, FakeJobDB(9), executor, "out")
+    assert len(peak) == 9
+    assert max(peak) == 3
+
+
+def test_process_batches_settles_siblings_before_raising(monkeypatch, executor):
+    started = []
+    finished = []
+    sibling_running = threading.Event()
+
+    def fake_batch(job, jobdb, batch_row, outputs_dir):
+        started.append(batch_row["id"])
+        if batch_row["id"] == 1:
+            sibling_running.wait(5)
+            raise RuntimeError("batch failed")
+        sibling_running.set()
+        time.sleep(0.1)
+        finished.append(batch_row["id"])
+
+    monkeypatch.setattr(worker, "process_batch", fake_batch)
+    with pytest.raises(RuntimeError):
+        worker.process_batches({"job_id": 1, "concurrency": 2}, FakeJobDB(4), executor, "out")
+    # The running sibling finished before the error surfaced; later batches never started
+    assert finished == [2]
+    assert sorted(started) == [1, 2]